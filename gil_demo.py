@@ -1,3 +1,4 @@
+import argparse
 import time
 from threading import Thread
 
@@ -9,21 +10,57 @@ def countdown():
     while n > 0:
         n -= 1
 
-# --- Sequential Execution ---
-start_time = time.time()
-countdown()
-countdown()
-end_time = time.time()
-print(f"Sequential execution took: {end_time - start_time:.4f} seconds")
-
-# --- Threaded Execution ---
-thread1 = Thread(target=countdown)
-thread2 = Thread(target=countdown)
-
-start_time = time.time()
-thread1.start()
-thread2.start()
-thread1.join()
-thread2.join()
-end_time = time.time()
-print(f"Threaded execution took:   {end_time - start_time:.4f} seconds")
+def make_nogil_countdown():
+    """Compile the countdown with Numba so it runs as machine code with the GIL released."""
+    from numba import njit
+
+    @njit(nogil=True, cache=True)
+    def _countdown(n):
+        # A bare `n -= 1` loop is folded away by LLVM, so carry a little
+        # state through each iteration to keep the work measurable.
+        x = 1
+        while n > 0:
+            x = (x * 1103515245 + 12345) & 0x7fffffff
+            n -= 1
+        return x
+
+    _countdown(1)  # compile (or load from cache) before anything is timed
+
+    def countdown_nogil():
+        """Same countdown, but both threads can run it at once."""
+        _countdown(COUNT)
+
+    return countdown_nogil
+
+def run(func, label):
+    print(f"--- {label} ---")
+
+    # --- Sequential Execution ---
+    start_time = time.time()
+    func()
+    func()
+    end_time = time.time()
+    print(f"Sequential execution took: {end_time - start_time:.4f} seconds")
+
+    # --- Threaded Execution ---
+    thread1 = Thread(target=func)
+    thread2 = Thread(target=func)
+
+    start_time = time.time()
+    thread1.start()
+    thread2.start()
+    thread1.join()
+    thread2.join()
+    end_time = time.time()
+    print(f"Threaded execution took:   {end_time - start_time:.4f} seconds")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time a CPU-bound countdown sequentially and on two threads.")
+    parser.add_argument("--impl", choices=["python", "numba", "both"], default="both",
+                        help="pure-Python countdown (holds the GIL), Numba nogil countdown, or both (default)")
+    args = parser.parse_args()
+
+    if args.impl in ("python", "both"):
+        run(countdown, "Pure Python (GIL held)")
+    if args.impl in ("numba", "both"):
+        run(make_nogil_countdown(), "Numba nogil (GIL released)")
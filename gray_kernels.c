@@ -0,0 +1,273 @@
+/* gray_kernels.c
+ *
+ * SIMD implementations of the grayscale row kernel. Each x86 kernel is
+ * compiled for its own instruction set with a target attribute, so the
+ * extension builds without -march flags; a load-time constructor checks
+ * the CPU and points gray_row_impl at the best one. NEON is part of the
+ * ARM64 baseline and is selected at compile time.
+ */
+#include "gray_kernels.h"
+
+#ifdef GRAY_X86
+#include <immintrin.h>
+#endif
+
+#ifdef GRAY_NEON
+#include <arm_neon.h>
+#endif
+
+#ifdef GRAY_X86
+
+/* Plain C conversion for the few pixels a SIMD kernel handles on its own */
+static inline void gray_row_scalar(const uint8_t *src, uint8_t *dst, ptrdiff_t n)
+{
+    for (ptrdiff_t i = 0; i < n; i++)
+        dst[i] = (uint8_t)((GRAY_WR * src[3 * i] + GRAY_WG * src[3 * i + 1]
+                            + GRAY_WB * src[3 * i + 2]) >> 8);
+}
+
+/* Number of leading pixels to convert before dst reaches an align-byte
+ * boundary, so the rest of the row can use aligned (or streaming) stores. */
+static inline ptrdiff_t gray_head(const uint8_t *dst, ptrdiff_t align)
+{
+    return (ptrdiff_t)(-(uintptr_t)dst & (uintptr_t)(align - 1));
+}
+
+/* pshufb masks that gather one channel of 16 packed RGB pixels (48 bytes)
+ * out of the three 16-byte blocks a, m and c; -1 writes a zero byte. */
+#define GRAY_R_A 0, 3, 6, 9, 12, 15, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1
+#define GRAY_R_M -1, -1, -1, -1, -1, -1, 2, 5, 8, 11, 14, -1, -1, -1, -1, -1
+#define GRAY_R_C -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 1, 4, 7, 10, 13
+#define GRAY_G_A 1, 4, 7, 10, 13, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1
+#define GRAY_G_M -1, -1, -1, -1, -1, 0, 3, 6, 9, 12, 15, -1, -1, -1, -1, -1
+#define GRAY_G_C -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 2, 5, 8, 11, 14
+#define GRAY_B_A 2, 5, 8, 11, 14, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1
+#define GRAY_B_M -1, -1, -1, -1, -1, 1, 4, 7, 10, 13, -1, -1, -1, -1, -1, -1
+#define GRAY_B_C -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 3, 6, 9, 12, 15
+
+__attribute__((target("ssse3")))
+ptrdiff_t gray_row_ssse3(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream)
+{
+    const __m128i zero = _mm_setzero_si128();
+    const __m128i wr = _mm_set1_epi16(GRAY_WR);
+    const __m128i wg = _mm_set1_epi16(GRAY_WG);
+    const __m128i wb = _mm_set1_epi16(GRAY_WB);
+    ptrdiff_t i = gray_head(dst, 16);
+
+    if (i + 16 > n)
+        return 0;
+    gray_row_scalar(src, dst, i);
+
+    /* 16 pixels per iteration */
+    for (; i + 16 <= n; i += 16) {
+        const uint8_t *p = src + 3 * i;
+        __m128i a = _mm_loadu_si128((const __m128i *)p);
+        __m128i m = _mm_loadu_si128((const __m128i *)(p + 16));
+        __m128i c = _mm_loadu_si128((const __m128i *)(p + 32));
+
+        __m128i r = _mm_or_si128(_mm_or_si128(
+            _mm_shuffle_epi8(a, _mm_setr_epi8(GRAY_R_A)),
+            _mm_shuffle_epi8(m, _mm_setr_epi8(GRAY_R_M))),
+            _mm_shuffle_epi8(c, _mm_setr_epi8(GRAY_R_C)));
+        __m128i g = _mm_or_si128(_mm_or_si128(
+            _mm_shuffle_epi8(a, _mm_setr_epi8(GRAY_G_A)),
+            _mm_shuffle_epi8(m, _mm_setr_epi8(GRAY_G_M))),
+            _mm_shuffle_epi8(c, _mm_setr_epi8(GRAY_G_C)));
+        __m128i b = _mm_or_si128(_mm_or_si128(
+            _mm_shuffle_epi8(a, _mm_setr_epi8(GRAY_B_A)),
+            _mm_shuffle_epi8(m, _mm_setr_epi8(GRAY_B_M))),
+            _mm_shuffle_epi8(c, _mm_setr_epi8(GRAY_B_C)));
+
+        /* Widen to 16 bits; the weighted sum is at most 255 * 256 and fits */
+        __m128i lo = _mm_add_epi16(_mm_add_epi16(
+            _mm_mullo_epi16(_mm_unpacklo_epi8(r, zero), wr),
+            _mm_mullo_epi16(_mm_unpacklo_epi8(g, zero), wg)),
+            _mm_mullo_epi16(_mm_unpacklo_epi8(b, zero), wb));
+        __m128i hi = _mm_add_epi16(_mm_add_epi16(
+            _mm_mullo_epi16(_mm_unpackhi_epi8(r, zero), wr),
+            _mm_mullo_epi16(_mm_unpackhi_epi8(g, zero), wg)),
+            _mm_mullo_epi16(_mm_unpackhi_epi8(b, zero), wb));
+
+        lo = _mm_srli_epi16(lo, 8);
+        hi = _mm_srli_epi16(hi, 8);
+        if (stream)
+            _mm_stream_si128((__m128i *)(dst + i), _mm_packus_epi16(lo, hi));
+        else
+            _mm_store_si128((__m128i *)(dst + i), _mm_packus_epi16(lo, hi));
+    }
+    if (stream)
+        _mm_sfence();
+    return i;
+}
+
+__attribute__((target("avx2")))
+ptrdiff_t gray_row_avx2(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream)
+{
+    const __m256i wr = _mm256_set1_epi16(GRAY_WR);
+    const __m256i wg = _mm256_set1_epi16(GRAY_WG);
+    const __m256i wb = _mm256_set1_epi16(GRAY_WB);
+    ptrdiff_t i = gray_head(dst, 32);
+
+    if (i + 32 > n)
+        return 0;
+    gray_row_scalar(src, dst, i);
+
+    /* 32 pixels per iteration: each 128-bit lane holds one group of 16
+     * pixels, so the in-lane pshufb deinterleaves both groups at once. */
+    for (; i + 32 <= n; i += 32) {
+        const uint8_t *p = src + 3 * i;
+        __m256i a = _mm256_inserti128_si256(
+            _mm256_castsi128_si256(_mm_loadu_si128((const __m128i *)p)),
+            _mm_loadu_si128((const __m128i *)(p + 48)), 1);
+        __m256i m = _mm256_inserti128_si256(
+            _mm256_castsi128_si256(_mm_loadu_si128((const __m128i *)(p + 16))),
+            _mm_loadu_si128((const __m128i *)(p + 64)), 1);
+        __m256i c = _mm256_inserti128_si256(
+            _mm256_castsi128_si256(_mm_loadu_si128((const __m128i *)(p + 32))),
+            _mm_loadu_si128((const __m128i *)(p + 80)), 1);
+
+        __m256i r = _mm256_or_si256(_mm256_or_si256(
+            _mm256_shuffle_epi8(a, _mm256_setr_epi8(GRAY_R_A, GRAY_R_A)),
+            _mm256_shuffle_epi8(m, _mm256_setr_epi8(GRAY_R_M, GRAY_R_M))),
+            _mm256_shuffle_epi8(c, _mm256_setr_epi8(GRAY_R_C, GRAY_R_C)));
+        __m256i g = _mm256_or_si256(_mm256_or_si256(
+            _mm256_shuffle_epi8(a, _mm256_setr_epi8(GRAY_G_A, GRAY_G_A)),
+            _mm256_shuffle_epi8(m, _mm256_setr_epi8(GRAY_G_M, GRAY_G_M))),
+            _mm256_shuffle_epi8(c, _mm256_setr_epi8(GRAY_G_C, GRAY_G_C)));
+        __m256i b = _mm256_or_si256(_mm256_or_si256(
+            _mm256_shuffle_epi8(a, _mm256_setr_epi8(GRAY_B_A, GRAY_B_A)),
+            _mm256_shuffle_epi8(m, _mm256_setr_epi8(GRAY_B_M, GRAY_B_M))),
+            _mm256_shuffle_epi8(c, _mm256_setr_epi8(GRAY_B_C, GRAY_B_C)));
+
+        __m256i lo = _mm256_add_epi16(_mm256_add_epi16(
+            _mm256_mullo_epi16(_mm256_cvtepu8_epi16(_mm256_castsi256_si128(r)), wr),
+            _mm256_mullo_epi16(_mm256_cvtepu8_epi16(_mm256_castsi256_si128(g)), wg)),
+            _mm256_mullo_epi16(_mm256_cvtepu8_epi16(_mm256_castsi256_si128(b)), wb));
+        __m256i hi = _mm256_add_epi16(_mm256_add_epi16(
+            _mm256_mullo_epi16(_mm256_cvtepu8_epi16(_mm256_extracti128_si256(r, 1)), wr),
+            _mm256_mullo_epi16(_mm256_cvtepu8_epi16(_mm256_extracti128_si256(g, 1)), wg)),
+            _mm256_mullo_epi16(_mm256_cvtepu8_epi16(_mm256_extracti128_si256(b, 1)), wb));
+
+        lo = _mm256_srli_epi16(lo, 8);
+        hi = _mm256_srli_epi16(hi, 8);
+
+        /* packus interleaves the 128-bit lanes; permute restores pixel order */
+        __m256i out = _mm256_permute4x64_epi64(_mm256_packus_epi16(lo, hi), 0xD8);
+
+        /* A streaming store skips the read-for-ownership a normal store
+         * does on each output line, at the cost of not caching it */
+        if (stream)
+            _mm256_stream_si256((__m256i *)(dst + i), out);
+        else
+            _mm256_store_si256((__m256i *)(dst + i), out);
+    }
+    if (stream)
+        _mm_sfence();
+    return i;
+}
+
+__attribute__((target("avx512f,avx512bw,avx512vnni")))
+ptrdiff_t gray_row_avx512vnni(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream)
+{
+    /* 150 does not fit vpdpbusd's signed 8-bit weights, so each pixel is
+     * expanded to R,G,B,G and weighted by 77,75,29,75: 75 + 75 == 150. */
+    const __m512i weights = _mm512_set1_epi32(
+        GRAY_WR | ((GRAY_WG / 2) << 8) | (GRAY_WB << 16) | ((GRAY_WG / 2) << 24));
+    /* Give each 128-bit lane the 12 bytes (4 pixels) it will expand */
+    const __m512i spread = _mm512_setr_epi32(
+        0, 1, 2, 0, 3, 4, 5, 0, 6, 7, 8, 0, 9, 10, 11, 0);
+    const __m512i expand = _mm512_broadcast_i32x4(_mm_setr_epi8(
+        0, 1, 2, 1, 3, 4, 5, 4, 6, 7, 8, 7, 9, 10, 11, 10));
+    ptrdiff_t i = gray_head(dst, 16);
+
+    if (i + 16 > n)
+        return 0;
+    gray_row_scalar(src, dst, i);
+
+    /* 16 pixels per iteration; the masked load reads exactly 48 bytes */
+    for (; i + 16 <= n; i += 16) {
+        __m512i px = _mm512_maskz_loadu_epi8(0xFFFFFFFFFFFFULL, src + 3 * i);
+        px = _mm512_shuffle_epi8(_mm512_permutexvar_epi32(spread, px), expand);
+        __m512i acc = _mm512_dpbusd_epi32(_mm512_setzero_si512(), px, weights);
+        acc = _mm512_srli_epi32(acc, 8);
+        if (stream)
+            _mm_stream_si128((__m128i *)(dst + i), _mm512_cvtusepi32_epi8(acc));
+        else
+            _mm_store_si128((__m128i *)(dst + i), _mm512_cvtusepi32_epi8(acc));
+    }
+    if (stream)
+        _mm_sfence();
+    return i;
+}
+
+#endif /* GRAY_X86 */
+
+#ifdef GRAY_NEON
+
+ptrdiff_t gray_row_neon(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream)
+{
+    const uint8x8_t wr = vdup_n_u8(GRAY_WR);
+    const uint8x8_t wg = vdup_n_u8(GRAY_WG);
+    const uint8x8_t wb = vdup_n_u8(GRAY_WB);
+    ptrdiff_t i = 0;
+
+    /* NEON intrinsics have no non-temporal store; stream is a hint only */
+    (void)stream;
+
+    /* 16 pixels per iteration; vld3q deinterleaves R, G and B as it loads */
+    for (; i + 16 <= n; i += 16) {
+        uint8x16x3_t px = vld3q_u8(src + 3 * i);
+
+        uint16x8_t lo = vmull_u8(vget_low_u8(px.val[0]), wr);
+        lo = vmlal_u8(lo, vget_low_u8(px.val[1]), wg);
+        lo = vmlal_u8(lo, vget_low_u8(px.val[2]), wb);
+
+        uint16x8_t hi = vmull_u8(vget_high_u8(px.val[0]), wr);
+        hi = vmlal_u8(hi, vget_high_u8(px.val[1]), wg);
+        hi = vmlal_u8(hi, vget_high_u8(px.val[2]), wb);
+
+        vst1q_u8(dst + i, vcombine_u8(vshrn_n_u16(lo, 8), vshrn_n_u16(hi, 8)));
+    }
+    return i;
+}
+
+#endif /* GRAY_NEON */
+
+/* Used when no SIMD kernel applies: converts nothing, so the caller's
+ * scalar loop handles the whole row. */
+static ptrdiff_t gray_row_none(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream)
+{
+    (void)src;
+    (void)dst;
+    (void)n;
+    (void)stream;
+    return 0;
+}
+
+#ifdef GRAY_NEON
+gray_row_fn gray_row_impl = gray_row_neon;
+const char *gray_row_name = "neon";
+#else
+gray_row_fn gray_row_impl = gray_row_none;
+const char *gray_row_name = "none";
+#endif
+
+#ifdef GRAY_X86
+
+__attribute__((constructor))
+static void gray_dispatch(void)
+{
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx512bw") && __builtin_cpu_supports("avx512vnni")) {
+        gray_row_impl = gray_row_avx512vnni;
+        gray_row_name = "avx512vnni";
+    } else if (__builtin_cpu_supports("avx2")) {
+        gray_row_impl = gray_row_avx2;
+        gray_row_name = "avx2";
+    } else if (__builtin_cpu_supports("ssse3")) {
+        gray_row_impl = gray_row_ssse3;
+        gray_row_name = "ssse3";
+    }
+}
+
+#endif /* GRAY_X86 */
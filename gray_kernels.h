@@ -0,0 +1,46 @@
+/* gray_kernels.h
+ *
+ * SIMD row kernels for the BT.601 grayscale conversion used by image_cython.
+ * Pixels are packed RGB (3 bytes each); the output is one byte per pixel,
+ * computed with Q8 fixed-point weights: (77*R + 150*G + 29*B) >> 8.
+ */
+#ifndef GRAY_KERNELS_H
+#define GRAY_KERNELS_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#define GRAY_WR 77
+#define GRAY_WG 150
+#define GRAY_WB 29
+
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+#define GRAY_X86 1
+#endif
+
+#if defined(__ARM_NEON) || defined(__ARM_NEON__)
+#define GRAY_NEON 1
+#endif
+
+/* A row kernel converts the leading pixels of a row of n pixels and returns
+ * how many it wrote; the caller converts the remaining tail. A non-zero
+ * stream asks for non-temporal stores, which write the output around the
+ * cache instead of through it. */
+typedef ptrdiff_t (*gray_row_fn)(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream);
+
+#ifdef GRAY_X86
+ptrdiff_t gray_row_ssse3(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream);
+ptrdiff_t gray_row_avx2(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream);
+ptrdiff_t gray_row_avx512vnni(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream);
+#endif
+
+#ifdef GRAY_NEON
+ptrdiff_t gray_row_neon(const uint8_t *src, uint8_t *dst, ptrdiff_t n, int stream);
+#endif
+
+/* The best kernel for this CPU and its name, set when the module is loaded.
+ * On builds without any SIMD kernel it converts nothing and is named "none". */
+extern gray_row_fn gray_row_impl;
+extern const char *gray_row_name;
+
+#endif /* GRAY_KERNELS_H */
@@ -0,0 +1,85 @@
+import numpy as np
+from PIL import Image
+import time
+import cupy as cp
+
+# One GPU thread per pixel; the channels are passed as strided views of the RGB tile
+_gray_kernel = cp.ElementwiseKernel(
+    "uint8 r, uint8 g, uint8 b",
+    "uint8 gray",
+    "gray = (77 * r + 150 * g + 29 * b) >> 8",
+    "gray_kernel",
+)
+
+def _pinned_empty(shape, dtype=np.uint8):
+    """Allocate a NumPy array in page-locked host memory so copies can run asynchronously."""
+    count = int(np.prod(shape))
+    mem = cp.cuda.alloc_pinned_memory(count * np.dtype(dtype).itemsize)
+    return np.frombuffer(mem, dtype, count).reshape(shape)
+
+def gpu_grayscale(image_path, num_tiles=8, num_streams=2):
+    """Loads an image and converts it to grayscale on the GPU, overlapping copies and compute."""
+    try:
+        img = Image.open(image_path)
+    except FileNotFoundError:
+        print(f"Error: The file '{image_path}' was not found.")
+        print("Please download a large JPG image and save it as 'sample_image.jpg'")
+        return None, 0
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img_data = np.asarray(img, dtype=np.uint8)
+    height, width, _ = img_data.shape
+
+    host_in = _pinned_empty(img_data.shape)
+    host_in[:] = img_data
+    host_out = _pinned_empty((height, width))
+    d_img = cp.empty(img_data.shape, dtype=cp.uint8)
+    d_gray = cp.empty((height, width), dtype=cp.uint8)
+    streams = [cp.cuda.Stream(non_blocking=True) for _ in range(num_streams)]
+    rows_per_tile = -(-height // num_tiles)
+
+    # Compile the kernel before timing starts
+    _gray_kernel(d_img[:1, :, 0], d_img[:1, :, 1], d_img[:1, :, 2], d_gray[:1])
+    cp.cuda.Device().synchronize()
+
+    start_time = time.time()
+
+    # Tiles alternate between streams, so one tile's host-to-device copy
+    # overlaps the previous tile's kernel and device-to-host copy
+    for i, start_row in enumerate(range(0, height, rows_per_tile)):
+        end_row = min(start_row + rows_per_tile, height)
+        stream = streams[i % num_streams]
+        tile_in = d_img[start_row:end_row]
+        tile_out = d_gray[start_row:end_row]
+
+        cp.cuda.runtime.memcpyAsync(
+            tile_in.data.ptr, host_in[start_row:end_row].ctypes.data, tile_in.nbytes,
+            cp.cuda.runtime.memcpyHostToDevice, stream.ptr
+        )
+        with stream:
+            _gray_kernel(tile_in[..., 0], tile_in[..., 1], tile_in[..., 2], tile_out)
+        cp.cuda.runtime.memcpyAsync(
+            host_out[start_row:end_row].ctypes.data, tile_out.data.ptr, tile_out.nbytes,
+            cp.cuda.runtime.memcpyDeviceToHost, stream.ptr
+        )
+
+    for stream in streams:
+        stream.synchronize()
+
+    end_time = time.time()
+
+    gray_image = Image.fromarray(host_out.copy())
+    return gray_image, (end_time - start_time)
+
+if __name__ == "__main__":
+    IMAGE_PATH = "Curiosity_Self-Portrait_at_'Big_Sky'_Drilling_Site.jpg"
+
+    print(f"Processing '{IMAGE_PATH}' with CUDA...")
+    gray_img, duration = gpu_grayscale(IMAGE_PATH)
+
+    if gray_img:
+        gray_img.save("result_cuda.jpg")
+        print(f"CUDA version took: {duration:.4f} seconds.")
+        print("Result saved to 'result_cuda.jpg'")
@@ -1,26 +1,76 @@
 # image_cython.pyx
-from cython.parallel import prange
+# cython: freethreading_compatible = True
+from cython.parallel import prange, parallel
+from libc.stddef cimport ptrdiff_t
 cimport cython
+cimport openmp
+import numpy as np
+
+cdef extern from "gray_kernels.h" nogil:
+    ctypedef ptrdiff_t (*gray_row_fn)(const unsigned char *src, unsigned char *dst, ptrdiff_t n, int stream) noexcept nogil
+    # Best SIMD row kernel for this CPU, picked when the extension is loaded
+    gray_row_fn gray_row_impl
+    const char *gray_row_name
+    # Q8 fixed-point BT.601 weights shared with the SIMD kernels
+    enum:
+        GRAY_WR
+        GRAY_WG
+        GRAY_WB
+
+def simd_kernel():
+    """Returns the name of the SIMD row kernel selected for this CPU."""
+    return gray_row_name.decode("ascii")
+
+def aligned_empty(shape, alignment=64):
+    """
+    Returns an uninitialized uint8 array whose data starts on an alignment-byte boundary.
+    Used for output planes so the kernels' stores start on a cache-line boundary.
+    """
+    size = int(np.prod(shape))
+    buf = np.empty(size + alignment, dtype=np.uint8)
+    offset = -buf.ctypes.data % alignment
+    return buf[offset:offset + size].reshape(shape)
+
+def openmp_threads():
+    """Returns the number of threads OpenMP uses by default (OMP_NUM_THREADS or the core count)."""
+    return openmp.omp_get_max_threads()
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def grayscale_cython(unsigned char[:, :, ::1] source_image, unsigned char[:, ::1] dest_image):
+def grayscale_cython(const unsigned char[:, :, ::1] source_image, unsigned char[:, ::1] dest_image,
+                     int num_threads=0, bint streaming=False):
     """
     Performs grayscale conversion using Cython and OpenMP.
     The source_image is the input (color), and the dest_image is the output (grayscale).
+    num_threads limits the OpenMP team size; 0 uses the OpenMP default.
+    streaming=True writes dest_image with non-temporal stores that bypass the cache,
+    which can pay off when the output is far larger than the last-level cache and
+    is not read again soon. It is off by default.
+    Each row goes through the SIMD kernel from gray_kernels.c first; any pixels it
+    leaves over (or the whole row, if no kernel is available) are converted here.
+    Luminance uses Q8 integer weights, (77*R + 150*G + 29*B) >> 8, instead of the
+    float 0.299/0.587/0.114, so results may be 1 lower than the float version.
     """
     cdef int height = source_image.shape[0]
     cdef int width = source_image.shape[1]
     cdef int x, y
+    cdef ptrdiff_t done
+
+    if width == 0:
+        return
+
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
 
     # Release the GIL to allow for true parallel processing
-    with nogil:
+    with nogil, parallel(num_threads=num_threads):
         # The prange function parallelizes the outer loop across multiple CPU cores
         for y in prange(height, schedule='static'):
-            for x in range(width):
+            done = gray_row_impl(&source_image[y, 0, 0], &dest_image[y, 0], width, streaming)
+            for x in range(done, width):
                 # Direct C-level access to pixel data
-                dest_image[y, x] = int(
-                    source_image[y, x, 0] * 0.299 +  # Red
-                    source_image[y, x, 1] * 0.587 +  # Green
-                    source_image[y, x, 2] * 0.114    # Blue
-                )
+                dest_image[y, x] = (
+                    GRAY_WR * source_image[y, x, 0] +  # Red
+                    GRAY_WG * source_image[y, x, 1] +  # Green
+                    GRAY_WB * source_image[y, x, 2]    # Blue
+                ) >> 8
@@ -0,0 +1,54 @@
+import numpy as np
+from PIL import Image
+import time
+from numba import njit, prange
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _gray(img, out):
+    """Grayscale kernel compiled to native code; prange splits rows across cores without the GIL."""
+    height, width, _ = img.shape
+    for y in prange(height):
+        for x in range(width):
+            out[y, x] = (77 * img[y, x, 0] + 150 * img[y, x, 1] + 29 * img[y, x, 2]) >> 8
+
+# Compile (or load from cache) at import time so benchmark timings exclude JIT compilation.
+# np.asarray(img) from Pillow is read-only, which Numba types separately from a
+# writable array, so warm up with a read-only input to get that specialization.
+_warm_img = np.zeros((1, 1, 3), dtype=np.uint8)
+_warm_img.flags.writeable = False
+_gray(_warm_img, np.zeros((1, 1), dtype=np.uint8))
+del _warm_img
+
+def numba_grayscale(image_path):
+    """Loads an image and converts it to grayscale using a parallel Numba kernel."""
+    try:
+        img = Image.open(image_path)
+    except FileNotFoundError:
+        print(f"Error: The file '{image_path}' was not found.")
+        print("Please download a large JPG image and save it as 'sample_image.jpg'")
+        return None, 0
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img_data = np.asarray(img, dtype=np.uint8)
+    height, width, _ = img_data.shape
+    gray_data = np.zeros((height, width), dtype=np.uint8)
+
+    start_time = time.time()
+    _gray(img_data, gray_data)
+    end_time = time.time()
+
+    gray_image = Image.fromarray(gray_data)
+    return gray_image, (end_time - start_time)
+
+if __name__ == "__main__":
+    IMAGE_PATH = "Curiosity_Self-Portrait_at_'Big_Sky'_Drilling_Site.jpg"
+
+    print(f"Processing '{IMAGE_PATH}' with Numba...")
+    gray_img, duration = numba_grayscale(IMAGE_PATH)
+
+    if gray_img:
+        gray_img.save("result_numba.jpg")
+        print(f"Numba version took: {duration:.4f} seconds.")
+        print("Result saved to 'result_numba.jpg'")
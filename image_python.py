@@ -2,6 +2,9 @@ import numpy as np
 from PIL import Image
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import multiprocessing
+from multiprocessing import shared_memory
 from tqdm import tqdm
 
 def python_grayscale(image_path):
@@ -13,23 +16,37 @@ def python_grayscale(image_path):
         print("Please download a large JPG image and save it as 'sample_image.jpg'")
         return None, 0
 
+    # The per-pixel code indexes three channels, so normalize L, RGBA, P, ... inputs
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
     img_data = np.asarray(img, dtype=np.uint8)
     height, width, _ = img_data.shape
     gray_data = np.zeros((height, width), dtype=np.uint8)
     
     start_time = time.time()
 
-    with tqdm(total=height, desc="Processing rows", leave=False) as pbar:
-        for y in range(height):
-            for x in range(width):
-                r, g, b = img_data[y, x]
-                gray_value = int(0.299 * r + 0.587 * g + 0.114 * b)
-                gray_data[y, x] = gray_value
-            
-            if y % 10 == 0 or y == height - 1:
-                pbar.update(min(10, height - pbar.n))
+    # Flat per-channel bytes: indexing bytes yields a plain int instead of
+    # building a new ndarray for every pixel
+    flat = img_data.reshape(-1, 3)
+    r_flat = flat[:, 0].tobytes()
+    g_flat = flat[:, 1].tobytes()
+    b_flat = flat[:, 2].tobytes()
+    out = bytearray(height * width)
+
+    # Q8 integer weights (0.299, 0.587, 0.114 ~= 77, 150, 29 / 256) keep the
+    # arithmetic in ints, avoiding three float objects and a conversion per pixel
+    for i in range(height * width):
+        gray_value = (77 * r_flat[i] + 150 * g_flat[i] + 29 * b_flat[i]) >> 8
+        out[i] = gray_value
+
+    gray_data[:] = np.frombuffer(out, dtype=np.uint8).reshape(height, width)
             
     end_time = time.time()
+
+    # Report progress outside the timed region so terminal I/O is not measured
+    with tqdm(total=height, desc="Processing rows", leave=False) as pbar:
+        pbar.update(height)
     
     gray_image = Image.fromarray(gray_data)
     return gray_image, (end_time - start_time)
@@ -43,28 +60,28 @@ def gil_grayscale(image_path, num_threads=4):
         print("Please download a large JPG image and save it as 'sample_image.jpg'")
         return None, 0
 
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
     img_data = np.asarray(img, dtype=np.uint8)
     height, width, _ = img_data.shape
     gray_data = np.zeros((height, width), dtype=np.uint8)
     
     start_time = time.time()
 
-    completed_rows = [0]
-    total_rows = height
-    
-    pbar = tqdm(total=total_rows, desc="Processing with threads", leave=False)
+    # Flat per-channel bytes shared by all threads; each thread writes a
+    # disjoint slice of the output buffer
+    flat = img_data.reshape(-1, 3)
+    r_flat = flat[:, 0].tobytes()
+    g_flat = flat[:, 1].tobytes()
+    b_flat = flat[:, 2].tobytes()
+    out = bytearray(height * width)
 
     def process_rows(start_row, end_row):
         """Process a range of rows for grayscale conversion."""
-        for y in range(start_row, end_row):
-            for x in range(width):
-                r, g, b = img_data[y, x]
-                gray_value = int(0.299 * r + 0.587 * g + 0.114 * b)
-                gray_data[y, x] = gray_value
-            
-            completed_rows[0] += 1
-            if completed_rows[0] % 10 == 0:
-                pbar.update(10)
+        for i in range(start_row * width, end_row * width):
+            gray_value = (77 * r_flat[i] + 150 * g_flat[i] + 29 * b_flat[i]) >> 8
+            out[i] = gray_value
 
     rows_per_thread = height // num_threads
     threads = []
@@ -80,14 +97,270 @@ def gil_grayscale(image_path, num_threads=4):
     for thread in threads:
         thread.join()
     
-    pbar.update(total_rows - pbar.n)
-    pbar.close()
+    gray_data[:] = np.frombuffer(out, dtype=np.uint8).reshape(height, width)
             
     end_time = time.time()
+
+    # Report progress outside the timed region so terminal I/O is not measured
+    with tqdm(total=height, desc="Processing with threads", leave=False) as pbar:
+        pbar.update(height)
     
     gray_image = Image.fromarray(gray_data)
     return gray_image, (end_time - start_time)
 
+def _process_band(in_name, out_name, height, width, start_row, end_row):
+    """Worker: convert a band of rows between two shared-memory buffers."""
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        img_data = np.ndarray((height, width, 3), dtype=np.uint8, buffer=shm_in.buf)
+
+        flat = img_data[start_row:end_row].reshape(-1, 3)
+        r_flat = flat[:, 0].tobytes()
+        g_flat = flat[:, 1].tobytes()
+        b_flat = flat[:, 2].tobytes()
+        out = bytearray(len(r_flat))
+
+        # Same Q8 integer weights as python_grayscale
+        for i in range(len(out)):
+            out[i] = (77 * r_flat[i] + 150 * g_flat[i] + 29 * b_flat[i]) >> 8
+
+        # The output plane is row-major, so the band is one contiguous byte range
+        shm_out.buf[start_row * width:end_row * width] = out
+
+        # The views must be released before the shared memory can be closed
+        del img_data, flat
+    finally:
+        shm_in.close()
+        shm_out.close()
+    return end_row - start_row
+
+# Set in each process_grayscale worker by _init_worker
+_ready_barrier = None
+
+def _init_worker(barrier):
+    """Worker initializer: keep the start-up barrier shared by the pool."""
+    global _ready_barrier
+    _ready_barrier = barrier
+
+def _worker_ready():
+    """Warm-up task: block until every worker in the pool has started."""
+    _ready_barrier.wait()
+
+def process_grayscale(image_path, num_processes=4):
+    """Loads an image and converts it to grayscale using multiple processes over shared memory."""
+    try:
+        img = Image.open(image_path)
+    except FileNotFoundError:
+        print(f"Error: The file '{image_path}' was not found.")
+        print("Please download a large JPG image and save it as 'sample_image.jpg'")
+        return None, 0
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img_data = np.asarray(img, dtype=np.uint8)
+    height, width, _ = img_data.shape
+
+    # Workers attach to these blocks by name, so the image is never pickled
+    shm_in = shared_memory.SharedMemory(create=True, size=img_data.nbytes)
+    shm_out = None
+
+    try:
+        shm_out = shared_memory.SharedMemory(create=True, size=height * width)
+        shared_img = np.ndarray(img_data.shape, dtype=np.uint8, buffer=shm_in.buf)
+        shared_img[:] = img_data
+        shared_gray = np.ndarray((height, width), dtype=np.uint8, buffer=shm_out.buf)
+
+        rows_per_process = height // num_processes
+
+        # Spawn fresh workers: forking a parent that already runs native
+        # thread pools (OpenMP, Numba) can deadlock the children
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(num_processes)
+        with ProcessPoolExecutor(max_workers=num_processes, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(barrier,)) as executor:
+            # Each spawned worker re-imports the __main__ module, which can take
+            # seconds. A worker runs one task at a time, so these tasks can only
+            # pass the barrier once all of them are up; start the clock after that.
+            for future in [executor.submit(_worker_ready) for _ in range(num_processes)]:
+                future.result()
+
+            start_time = time.time()
+
+            futures = []
+            for i in range(num_processes):
+                start_row = i * rows_per_process
+                end_row = (i + 1) * rows_per_process if i < num_processes - 1 else height
+                futures.append(executor.submit(
+                    _process_band, shm_in.name, shm_out.name, height, width, start_row, end_row
+                ))
+
+            rows_done = sum(future.result() for future in as_completed(futures))
+
+            end_time = time.time()
+
+        # Report progress outside the timed region so terminal I/O is not measured
+        with tqdm(total=height, desc="Processing with processes", leave=False) as pbar:
+            pbar.update(rows_done)
+
+        gray_data = shared_gray.copy()
+        del shared_img, shared_gray
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+        if shm_out is not None:
+            shm_out.close()
+            shm_out.unlink()
+
+    gray_image = Image.fromarray(gray_data)
+    return gray_image, (end_time - start_time)
+
+def swar_grayscale(image_path):
+    """Loads an image and converts it to grayscale a whole row at a time using big-integer arithmetic."""
+    try:
+        img = Image.open(image_path)
+    except FileNotFoundError:
+        print(f"Error: The file '{image_path}' was not found.")
+        print("Please download a large JPG image and save it as 'sample_image.jpg'")
+        return None, 0
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img_data = np.asarray(img, dtype=np.uint8)
+    height, width, _ = img_data.shape
+    gray_data = np.zeros((height, width), dtype=np.uint8)
+
+    start_time = time.time()
+
+    flat = img_data.reshape(-1, 3)
+    r_flat = flat[:, 0].tobytes()
+    g_flat = flat[:, 1].tobytes()
+    b_flat = flat[:, 2].tobytes()
+    out = bytearray(height * width)
+
+    # Each pixel gets a 16-bit lane (high byte zero) inside one big integer per
+    # channel. The weighted sum is at most 255 * 256, so no lane carries into
+    # its neighbour, and the high byte of each lane is the Q8 result (>> 8).
+    lanes = bytearray(2 * width)
+
+    for y in range(height):
+        row = slice(y * width, (y + 1) * width)
+
+        lanes[1::2] = r_flat[row]
+        r_int = int.from_bytes(lanes, "big")
+        lanes[1::2] = g_flat[row]
+        g_int = int.from_bytes(lanes, "big")
+        lanes[1::2] = b_flat[row]
+        b_int = int.from_bytes(lanes, "big")
+
+        weighted = 77 * r_int + 150 * g_int + 29 * b_int
+        out[row] = weighted.to_bytes(2 * width, "big")[0::2]
+
+    gray_data[:] = np.frombuffer(out, dtype=np.uint8).reshape(height, width)
+
+    end_time = time.time()
+
+    gray_image = Image.fromarray(gray_data)
+    return gray_image, (end_time - start_time)
+
+def numpy_grayscale(image_path):
+    """Loads an image and converts it to grayscale using vectorized NumPy operations."""
+    try:
+        img = Image.open(image_path)
+    except FileNotFoundError:
+        print(f"Error: The file '{image_path}' was not found.")
+        print("Please download a large JPG image and save it as 'sample_image.jpg'")
+        return None, 0
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img_data = np.asarray(img, dtype=np.uint8)
+    height, width, _ = img_data.shape
+    gray_data = np.zeros((height, width), dtype=np.uint8)
+
+    start_time = time.time()
+
+    # BT.601 weights as Q8 fixed point: 0.299, 0.587, 0.114 ~= 77, 150, 29 / 256.
+    # uint16 is wide enough for the weighted sum (at most 255 * 256).
+    r = img_data[..., 0].astype(np.uint16)
+    g = img_data[..., 1].astype(np.uint16)
+    b = img_data[..., 2].astype(np.uint16)
+    gray_data[:] = ((r * 77 + g * 150 + b * 29) >> 8).astype(np.uint8)
+
+    end_time = time.time()
+
+    # Report progress outside the timed region so terminal I/O is not measured
+    with tqdm(total=height, desc="Processing with NumPy", leave=False) as pbar:
+        pbar.update(height)
+
+    gray_image = Image.fromarray(gray_data)
+    return gray_image, (end_time - start_time)
+
+def pillow_grayscale(image_path, num_threads=4):
+    """Loads an image and converts it to grayscale using Pillow's C conversion in multiple threads."""
+    try:
+        img = Image.open(image_path)
+    except FileNotFoundError:
+        print(f"Error: The file '{image_path}' was not found.")
+        print("Please download a large JPG image and save it as 'sample_image.jpg'")
+        return None, 0
+
+    # Decode up front so the worker threads only share a fully loaded image
+    img.load()
+    width, height = img.size
+    gray_image = Image.new("L", (width, height))
+
+    rows_per_thread = height // num_threads
+    boxes = []
+
+    for i in range(num_threads):
+        start_row = i * rows_per_thread
+        end_row = (i + 1) * rows_per_thread if i < num_threads - 1 else height
+        boxes.append((0, start_row, width, end_row))
+
+    def convert_band(box):
+        """Convert one horizontal band; Pillow releases the GIL inside convert()."""
+        return box, img.crop(box).convert("L")
+
+    start_time = time.time()
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for box, band in executor.map(convert_band, boxes):
+            gray_image.paste(band, box[:2])
+
+    end_time = time.time()
+
+    # Report progress outside the timed region so terminal I/O is not measured
+    with tqdm(total=height, desc="Processing with Pillow", leave=False) as pbar:
+        pbar.update(height)
+
+    return gray_image, (end_time - start_time)
+
+def fused_grayscale(image_path):
+    """Decodes an image straight to grayscale, without building the full RGB array first."""
+    try:
+        img = Image.open(image_path)
+    except FileNotFoundError:
+        print(f"Error: The file '{image_path}' was not found.")
+        print("Please download a large JPG image and save it as 'sample_image.jpg'")
+        return None, 0
+
+    # Unlike the other variants, decoding is part of the timed work here
+    start_time = time.time()
+
+    # For JPEGs, draft() asks libjpeg to emit only the luminance plane while
+    # decoding, so the RGB pixels and the weighting pass are skipped entirely.
+    # Other formats ignore the request and go through convert() as usual.
+    img.draft("L", img.size)
+    gray_image = img.convert("L")
+
+    end_time = time.time()
+
+    return gray_image, (end_time - start_time)
+
 if __name__ == "__main__":
     IMAGE_PATH = "Curiosity_Self-Portrait_at_'Big_Sky'_Drilling_Site.jpg"
     
@@ -110,3 +383,47 @@ if __name__ == "__main__":
         if duration > 0:
             speedup = duration / duration_threaded
             print(f"Speedup: {speedup:.2f}x")
+
+    print(f"\nProcessing '{IMAGE_PATH}' with multiprocess Python...")
+    gray_img_process, duration_process = process_grayscale(IMAGE_PATH)
+
+    if gray_img_process:
+        gray_img_process.save("result_python_process.jpg")
+        print(f"Multiprocess Python version took: {duration_process:.4f} seconds.")
+        print("Result saved to 'result_python_process.jpg'")
+
+        if duration > 0:
+            speedup = duration / duration_process
+            print(f"Speedup: {speedup:.2f}x")
+
+    print(f"\nProcessing '{IMAGE_PATH}' with row-wise big-integer Python...")
+    gray_img_swar, duration_swar = swar_grayscale(IMAGE_PATH)
+
+    if gray_img_swar:
+        gray_img_swar.save("result_python_swar.jpg")
+        print(f"Big-integer Python version took: {duration_swar:.4f} seconds.")
+        print("Result saved to 'result_python_swar.jpg'")
+
+    print(f"\nProcessing '{IMAGE_PATH}' with NumPy...")
+    gray_img_numpy, duration_numpy = numpy_grayscale(IMAGE_PATH)
+
+    if gray_img_numpy:
+        gray_img_numpy.save("result_numpy.jpg")
+        print(f"NumPy version took: {duration_numpy:.4f} seconds.")
+        print("Result saved to 'result_numpy.jpg'")
+
+    print(f"\nProcessing '{IMAGE_PATH}' with Pillow...")
+    gray_img_pillow, duration_pillow = pillow_grayscale(IMAGE_PATH)
+
+    if gray_img_pillow:
+        gray_img_pillow.save("result_pillow.jpg")
+        print(f"Pillow version took: {duration_pillow:.4f} seconds.")
+        print("Result saved to 'result_pillow.jpg'")
+
+    print(f"\nProcessing '{IMAGE_PATH}' with fused decode + grayscale...")
+    gray_img_fused, duration_fused = fused_grayscale(IMAGE_PATH)
+
+    if gray_img_fused:
+        gray_img_fused.save("result_fused.jpg")
+        print(f"Fused decode version took: {duration_fused:.4f} seconds (including decode).")
+        print("Result saved to 'result_fused.jpg'")
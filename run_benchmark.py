@@ -1,10 +1,35 @@
+import argparse
+import glob
+import os
+import sys
 import numpy as np
 from PIL import Image
 import time
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
-from image_python import python_grayscale, gil_grayscale
-from image_cython import grayscale_cython
+from image_python import (
+    python_grayscale, gil_grayscale, process_grayscale, swar_grayscale, numpy_grayscale, pillow_grayscale,
+    fused_grayscale
+)
+from image_cython import grayscale_cython, simd_kernel, openmp_threads, aligned_empty
+
+try:
+    from image_numba import numba_grayscale
+except ImportError:
+    numba_grayscale = None
+
+try:
+    from image_cuda import gpu_grayscale
+except ImportError:
+    gpu_grayscale = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY, TJSAMP_GRAY
+    turbo_jpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    # PyTurboJPEG is optional, and TurboJPEG() fails if libturbojpeg is missing
+    turbo_jpeg = None
 
 # ANSI color codes for beautified output
 class Colors:
@@ -72,12 +97,85 @@ def run_with_progress(func, description, *args, **kwargs):
         pbar.update(100)
     return result
 
+def best_of(func, *args, repeats=5, **kwargs):
+    """Return the fastest of several timed calls, so one-off costs do not skew a comparison."""
+    best = float("inf")
+    for _ in range(repeats):
+        # perf_counter is monotonic and high-resolution; these calls can be sub-millisecond
+        start_time = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+def save_grayscale(gray_data, path):
+    """Save a grayscale plane as JPEG, encoding it directly with libjpeg-turbo when available."""
+    if turbo_jpeg is None:
+        Image.fromarray(gray_data).save(path)
+        return
+    # The array is handed to libjpeg-turbo as-is, with no intermediate PIL Image copy
+    jpeg = turbo_jpeg.encode(gray_data, quality=75, pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY)
+    with open(path, "wb") as f:
+        f.write(jpeg)
+
+def grayscale_file(image_path):
+    """Decode one image and convert it with the Cython kernel; runs in a worker thread."""
+    img = Image.open(image_path)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    # Decoding and the Cython kernel both release the GIL, so workers overlap fully
+    img_data = np.asarray(img, dtype=np.uint8)
+    gray_data = aligned_empty(img_data.shape[:2])
+    # One OpenMP thread per image: the thread pool already spreads images across cores
+    grayscale_cython(img_data, gray_data, num_threads=1)
+    return gray_data.size
+
+def run_batch(pattern):
+    """Convert every image matching pattern concurrently and report the aggregate throughput."""
+    image_paths = sorted(glob.glob(pattern))
+    if not image_paths:
+        print(f"{Colors.RED}❌ Error: No images match '{pattern}'.{Colors.END}")
+        sys.exit(1)
+
+    num_workers = os.cpu_count() or 1
+    print_section(1, f"Processing {len(image_paths)} images with Cython across {num_workers} threads", Colors.YELLOW)
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        total_pixels = sum(tqdm(
+            executor.map(grayscale_file, image_paths),
+            total=len(image_paths),
+            desc="Batch Processing"
+        ))
+    duration = time.time() - start_time
+
+    print_result(f"{len(image_paths)} images", duration, Colors.GREEN)
+    if duration > 0:
+        print(f"{Colors.CYAN}    Throughput: {Colors.BOLD}{total_pixels / 1e6 / duration:.1f} MP/s{Colors.END}")
+
 # --- Main script ---
 if __name__ == "__main__":
-    # Using a different image name from your traceback
-    IMAGE_PATH = "Curiosity_Self-Portrait_at_'Big_Sky'_Drilling_Site.jpg" 
+    parser = argparse.ArgumentParser(description="Benchmark grayscale conversion approaches.")
+    parser.add_argument(
+        "--batch", metavar="GLOB",
+        help="convert every image matching GLOB concurrently with the Cython kernel and report MP/s"
+    )
+    parser.add_argument(
+        "--image", default="Curiosity_Self-Portrait_at_'Big_Sky'_Drilling_Site.jpg",
+        help="image to benchmark (default: the Curiosity self-portrait in the repo)"
+    )
+    args = parser.parse_args()
+
+    IMAGE_PATH = args.image
     
     print_header()
+
+    # sys._is_gil_enabled() only exists on 3.13+; older interpreters always have the GIL
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{Colors.CYAN}Python {sys.version.split()[0]}, GIL enabled: {gil_enabled}{Colors.END}")
+
+    if args.batch:
+        run_batch(args.batch)
+        sys.exit()
     
     # Store results for comparison
     results = {}
@@ -108,17 +206,129 @@ if __name__ == "__main__":
         print(f"    💾 Result saved to 'result_python_threaded.jpg'\n")
         results["Threaded Python"] = duration_threaded
     
-    # --- 3. Cython Version ---
-    print_section(3, f"Processing '{IMAGE_PATH}' with Cython + OpenMP", Colors.YELLOW)
+    # --- 3. Multiprocess Python Version ---
+    print_section(3, f"Processing '{IMAGE_PATH}' with Multiprocess Python (4 processes)", Colors.YELLOW)
+    gray_img_proc, duration_proc = run_with_progress(
+        process_grayscale,
+        "Multiprocess Python Processing",
+        IMAGE_PATH
+    )
+    if gray_img_proc:
+        print_result("Multiprocess Python", duration_proc, Colors.GREEN)
+        gray_img_proc.save("result_python_process.jpg")
+        print(f"    💾 Result saved to 'result_python_process.jpg'\n")
+        results["Multiprocess Python"] = duration_proc
+    
+    # --- 4. Big-Integer Python Version ---
+    print_section(4, f"Processing '{IMAGE_PATH}' with row-wise Big-Integer Python", Colors.YELLOW)
+    gray_img_swar, duration_swar = run_with_progress(
+        swar_grayscale,
+        "Big-Integer Python Processing",
+        IMAGE_PATH
+    )
+    if gray_img_swar:
+        print_result("Big-Integer Python", duration_swar, Colors.GREEN)
+        gray_img_swar.save("result_python_swar.jpg")
+        print(f"    💾 Result saved to 'result_python_swar.jpg'\n")
+        results["Big-Integer Python"] = duration_swar
+    
+    # --- 5. NumPy Version ---
+    print_section(5, f"Processing '{IMAGE_PATH}' with NumPy", Colors.YELLOW)
+    gray_img_np, duration_np = run_with_progress(
+        numpy_grayscale,
+        "NumPy Processing",
+        IMAGE_PATH
+    )
+    if gray_img_np:
+        print_result("NumPy", duration_np, Colors.GREEN)
+        gray_img_np.save("result_numpy.jpg")
+        print(f"    💾 Result saved to 'result_numpy.jpg'\n")
+        results["NumPy"] = duration_np
+    
+    # --- 6. Pillow Version ---
+    print_section(6, f"Processing '{IMAGE_PATH}' with Pillow (4 threads)", Colors.YELLOW)
+    gray_img_pil, duration_pil = run_with_progress(
+        pillow_grayscale,
+        "Pillow Processing",
+        IMAGE_PATH
+    )
+    if gray_img_pil:
+        print_result("Pillow", duration_pil, Colors.GREEN)
+        gray_img_pil.save("result_pillow.jpg")
+        print(f"    💾 Result saved to 'result_pillow.jpg'\n")
+        results["Pillow"] = duration_pil
+    
+    # --- 7. Fused Decode Version ---
+    print_section(7, f"Processing '{IMAGE_PATH}' with fused decode + grayscale (includes decode)", Colors.YELLOW)
+    gray_img_fused, duration_fused = run_with_progress(
+        fused_grayscale,
+        "Fused Decode Processing",
+        IMAGE_PATH
+    )
+    if gray_img_fused:
+        print_result("Fused decode", duration_fused, Colors.GREEN)
+        gray_img_fused.save("result_fused.jpg")
+        print(f"    💾 Result saved to 'result_fused.jpg'\n")
+        results["Fused decode"] = duration_fused
+    
+    # Optional sections; stay None when they are skipped so the output check ignores them
+    gray_img_nb = gray_img_gpu = None
+    
+    # --- 8. Numba Version ---
+    print_section(8, f"Processing '{IMAGE_PATH}' with Numba (parallel JIT)", Colors.YELLOW)
+    if numba_grayscale is None:
+        print(f"{Colors.RED}❌ Numba is not installed, skipping.{Colors.END}")
+        print(f"{Colors.YELLOW}--> pip install numba{Colors.END}")
+    else:
+        gray_img_nb, duration_nb = run_with_progress(
+            numba_grayscale,
+            "Numba Processing",
+            IMAGE_PATH
+        )
+        if gray_img_nb:
+            print_result("Numba", duration_nb, Colors.GREEN)
+            gray_img_nb.save("result_numba.jpg")
+            print(f"    💾 Result saved to 'result_numba.jpg'\n")
+            results["Numba"] = duration_nb
+    
+    # --- 9. CUDA Version ---
+    print_section(9, f"Processing '{IMAGE_PATH}' with CUDA (CuPy, 2 streams)", Colors.YELLOW)
+    if gpu_grayscale is None:
+        print(f"{Colors.RED}❌ CuPy is not installed, skipping.{Colors.END}")
+        print(f"{Colors.YELLOW}--> pip install cupy-cuda12x{Colors.END}")
+    else:
+        try:
+            gray_img_gpu, duration_gpu = run_with_progress(
+                gpu_grayscale,
+                "CUDA Processing",
+                IMAGE_PATH
+            )
+            if gray_img_gpu:
+                print_result("CUDA", duration_gpu, Colors.GREEN)
+                gray_img_gpu.save("result_cuda.jpg")
+                print(f"    💾 Result saved to 'result_cuda.jpg'\n")
+                results["CUDA"] = duration_gpu
+        except Exception as e:
+            print(f"{Colors.RED}❌ CUDA error: {e}{Colors.END}")
+    
+    # --- 10. Cython Version ---
+    print_section(10, f"Processing '{IMAGE_PATH}' with Cython + OpenMP", Colors.YELLOW)
+    print(f"{Colors.CYAN}    SIMD kernel selected for this CPU: {simd_kernel()}{Colors.END}")
     try:
         img = Image.open(IMAGE_PATH)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
         
         img_data = np.array(img, dtype=np.uint8) 
         # ------------------------------------
 
         height, width, _ = img_data.shape
         
-        gray_data_cy = np.zeros((height, width), dtype=np.uint8)
+        gray_data_cy = aligned_empty((height, width))
+        
+        # Untimed warm-up: the first call pays first-touch page faults on the
+        # fresh output plane and OpenMP team start-up
+        grayscale_cython(img_data, gray_data_cy)
         
         # Run Cython processing with progress bar
         with tqdm(total=100, desc="Cython Processing", bar_format='{desc}: {percentage:3.0f}%|{bar}| {elapsed}') as pbar:
@@ -129,12 +339,45 @@ if __name__ == "__main__":
         
         duration_cy = end_time - start_time
         
-        Image.fromarray(gray_data_cy).save("result_cython.jpg")
+        # Best-of-N on a single OpenMP thread and on the full team shows how the nogil loop scales
+        duration_cy_best = best_of(grayscale_cython, img_data, gray_data_cy)
+        duration_cy_single = best_of(grayscale_cython, img_data, gray_data_cy, num_threads=1)
+        if duration_cy_best > 0:
+            print(f"{Colors.CYAN}    OpenMP scaling: 1 thread {duration_cy_single:.4f}s vs "
+                  f"{openmp_threads()} threads {duration_cy_best:.4f}s "
+                  f"({duration_cy_single / duration_cy_best:.2f}x){Colors.END}")
+        
+        # Non-temporal stores are opt-in; whether they help depends on the cache size.
+        # Compare against the regular-store best-of-N timed the same way.
+        duration_cy_stream = best_of(grayscale_cython, img_data, gray_data_cy, streaming=True)
+        print(f"{Colors.CYAN}    Streaming stores: {duration_cy_stream:.4f}s vs regular stores {duration_cy_best:.4f}s{Colors.END}")
+        
+        save_grayscale(gray_data_cy, "result_cython.jpg")
         print_result("Cython + OpenMP", duration_cy, Colors.GREEN)
         print(f"    💾 Result saved to 'result_cython.jpg'\n")
         results["Cython + OpenMP"] = duration_cy
         
-        # --- 4. Comparison ---
+        # The Q8 variants must match the NumPy result bit for bit; a mismatch
+        # (e.g. a data race under free-threading) fails the run
+        if gray_img_np:
+            reference = np.asarray(gray_img_np)
+            outputs = {
+                "Pure Python": gray_img_py,
+                "Threaded Python": gray_img_threaded,
+                "Multiprocess Python": gray_img_proc,
+                "Big-Integer Python": gray_img_swar,
+                "Numba": gray_img_nb,
+                "CUDA": gray_img_gpu,
+                "Cython + OpenMP": gray_data_cy,
+            }
+            mismatched = [name for name, gray in outputs.items()
+                          if gray is not None and not np.array_equal(np.asarray(gray), reference)]
+            if mismatched:
+                print(f"{Colors.RED}❌ Output differs from NumPy: {', '.join(mismatched)}{Colors.END}")
+                sys.exit(1)
+            print(f"{Colors.GREEN}    ✓ All outputs match the NumPy result{Colors.END}")
+        
+        # --- 11. Comparison ---
         if results:
             print_comparison_table(results)
             
@@ -144,8 +387,12 @@ if __name__ == "__main__":
     except FileNotFoundError:
         print(f"{Colors.RED}❌ Error: Could not find '{IMAGE_PATH}' for the benchmark.{Colors.END}")
         print(f"{Colors.YELLOW}Please ensure the image file is in the same directory.{Colors.END}")
+        sys.exit(1)
     except ImportError:
         print(f"{Colors.RED}❌ Error: Cython module not found. Did you run the build command?{Colors.END}")
         print(f"{Colors.YELLOW}--> python setup_image.py build_ext --inplace{Colors.END}")
+        sys.exit(1)
     except Exception as e:
         print(f"{Colors.RED}❌ Unexpected error: {e}{Colors.END}")
+        # Exit non-zero so CI (including the free-threaded row) notices
+        sys.exit(1)
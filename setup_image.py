@@ -6,13 +6,17 @@ import numpy
 extensions = [
     Extension(
         "image_cython",
-        ["image_cython.pyx"],
-        extra_compile_args=["-fopenmp"],
+        ["image_cython.pyx", "gray_kernels.c"],
+        extra_compile_args=["-fopenmp", "-O3", "-ftree-vectorize"],
         extra_link_args=["-fopenmp"],
     )
 ]
 
 setup(
+    classifiers=[
+        "Programming Language :: Python :: 3.13",
+        "Programming Language :: Python :: Free Threading :: 2 - Beta",
+    ],
     ext_modules=cythonize(extensions),
     include_dirs=[numpy.get_include()]
 )